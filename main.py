@@ -1,6 +1,10 @@
 from fastapi import FastAPI, HTTPException
 from routers.endpoints import router
+from utils.chunker import shutdown_executor
 
 app = FastAPI()
 
+# Cerrar el pool de procesos del chunker al apagar la API
+app.add_event_handler("shutdown", shutdown_executor)
+
 app.include_router(router)
\ No newline at end of file
@@ -1,9 +1,9 @@
 from pydantic import BaseModel
 from models.models import RAG_context, RAG_answer, vectorstore, embedding_function_lc, determine_tool, search_by_author, search_by_content, search_by_doi
-from utils.utils import chunks_generation, extract_information_XMLdict, extract_doi_from_query, extract_author_from_query
+from utils.utils import chunks_generation, chunks_generation_batch, extract_information_XMLdict, extract_doi_from_query, extract_author_from_query
 from fastapi import FastAPI, UploadFile, HTTPException, APIRouter
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
-from langchain.text_splitter import RecursiveCharacterTextSplitter
 import xmltodict
 import traceback
 
@@ -12,11 +12,16 @@ router = APIRouter()
 # Diccionario global para almacenar los chunks con metadata
 chunks_con_metadata = {}
 
+# DOIs reservados por un /upload_batch mientras se generan sus chunks
+dois_en_proceso = set()
+
 class ChunkMetadata(BaseModel):    # Modelo para representar la metadata y chunks
     text: str
     title: str
     authors: str
     section_title: str
+    section_index: int  # Posición de la sección dentro del artículo
+    chunk_index: int    # Posición del chunk dentro de la sección
     doi: str
 
 class AskRequest(BaseModel):    # Modelo de la solicitud
@@ -35,31 +40,62 @@ class AskResponse(BaseModel):
     question: str  # La pregunta del usuario
     answer: str    # La respuesta generada por el modelo
 
+async def read_xml_file(file: UploadFile):
+    """
+    Valida y lee un archivo XML subido y extrae su información.
+    :return: Tupla (title, doi, authors, sections).
+    """
+    # Validar el tipo de archivo
+    if not file.filename.endswith(".xml"):
+        raise HTTPException(status_code=400, detail="El archivo debe ser un XML.")
+    
+    # Leer el contenido del archivo
+    xml_content = await file.read()
+    
+    # Convertir el contenido XML a un diccionario
+    try:
+        xml_dict = xmltodict.parse(xml_content)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error al procesar el XML: {str(e)}")
+    
+    # Extraer información del XML
+    try:
+        return extract_information_XMLdict(xml_content, xml_dict)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al extraer información del XML: {str(e)}")
+
+def store_chunks(doi: str, chunks_con_metadata_list: list[dict]):
+    """
+    Guarda los chunks generados de un documento en el diccionario global chunks_con_metadata.
+    """
+    # Si el DOI no existe en el diccionario, creamos una nueva entrada
+    if doi not in chunks_con_metadata:
+        chunks_con_metadata[doi] = []
+
+    # Añadir los chunks con metadata
+    for i, chunk_data in enumerate(chunks_con_metadata_list):
+        # Agregar el chunk al diccionario con su ID, texto y metadata
+        chunks_con_metadata[doi].append({
+            "id": f"{doi}_{i+1}",  # Generar un ID único basado en el DOI y un índice
+            "text": chunk_data["text"],
+            "title": chunk_data["title"],
+            "authors": chunk_data["authors"],
+            "section_title": chunk_data["section_title"],
+            "section_index": chunk_data["section_index"],
+            "chunk_index": chunk_data["chunk_index"],
+            "doi": chunk_data["doi"]
+        })
+
 @router.post("/upload")
 async def upload_file(file: UploadFile):
     try:
-        # Validar el tipo de archivo
-        if not file.filename.endswith(".xml"):
-            raise HTTPException(status_code=400, detail="El archivo debe ser un XML.")
-        
-        # Leer el contenido del archivo
-        xml_content = await file.read()
-        
-        # Convertir el contenido XML a un diccionario
-        try:
-            xml_dict = xmltodict.parse(xml_content)
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=f"Error al procesar el XML: {str(e)}")
-        
-        # Extraer información del XML
-        try:
-            title, doi, authors, sections = extract_information_XMLdict(xml_content, xml_dict)
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Error al extraer información del XML: {str(e)}")
+        title, doi, authors, sections = await read_xml_file(file)
 
         # Verificar si el DOI ya está cargado en el diccionario
         if doi in chunks_con_metadata and chunks_con_metadata[doi]:
             raise HTTPException(status_code=400, detail=f"El DOI '{doi}' ya está cargado pero no embebido.")
+        if doi in dois_en_proceso:
+            raise HTTPException(status_code=400, detail=f"El DOI '{doi}' se está cargando en otra solicitud.")
         
         # Generar los chunks a partir de las secciones
         try:
@@ -67,21 +103,7 @@ async def upload_file(file: UploadFile):
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error al generar chunks: {str(e)}")
 
-        # Si el DOI no existe en el diccionario, creamos una nueva entrada
-        if doi not in chunks_con_metadata:
-            chunks_con_metadata[doi] = []
-
-        # Añadir los chunks con metadata
-        for i, chunk_data in enumerate(chunks_con_metadata_list):
-            # Agregar el chunk al diccionario con su ID, texto y metadata
-            chunks_con_metadata[doi].append({
-                "id": f"{doi}_{i+1}",  # Generar un ID único basado en el DOI y un índice
-                "text": chunk_data["text"],
-                "title": chunk_data["title"],
-                "authors": chunk_data["authors"],
-                #"section_title": chunk_data["section_title"],
-                "doi": chunk_data["doi"]
-            })
+        store_chunks(doi, chunks_con_metadata_list)
         
         # Imprimir el diccionario para verificar el contenido
         print(f"Chunks cargados para el DOI {doi}: {chunks_con_metadata[doi]}")
@@ -101,6 +123,56 @@ async def upload_file(file: UploadFile):
             content={"detail": "Error interno en el servidor.", "traceback": traceback_str},
         )
 
+@router.post("/upload_batch")
+async def upload_files(files: list[UploadFile]):
+    """
+    Subir varios archivos XML a la vez. Los chunks de todos los documentos se generan
+    fuera del event loop, en paralelo si CHUNK_WORKERS es mayor que 1.
+    """
+    try:
+        papers = []
+        for file in files:
+            papers.append(await read_xml_file(file))
+
+        # Verificar los DOIs y reservarlos sin ningún await de por medio, para que otra
+        # solicitud no pueda cargar el mismo DOI mientras se generan los chunks
+        dois = [paper[1] for paper in papers]
+        for i, doi in enumerate(dois):
+            if doi in dois[:i]:
+                raise HTTPException(status_code=400, detail=f"El DOI '{doi}' está repetido en la solicitud.")
+            if doi in chunks_con_metadata and chunks_con_metadata[doi]:
+                raise HTTPException(status_code=400, detail=f"El DOI '{doi}' ya está cargado pero no embebido.")
+            if doi in dois_en_proceso:
+                raise HTTPException(status_code=400, detail=f"El DOI '{doi}' se está cargando en otra solicitud.")
+        dois_en_proceso.update(dois)
+
+        try:
+            # Generar los chunks de todos los artículos sin bloquear el servidor
+            try:
+                chunks_por_articulo = await run_in_threadpool(chunks_generation_batch, papers)
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=f"Error al generar chunks: {str(e)}")
+
+            for doi, chunks_con_metadata_list in zip(dois, chunks_por_articulo):
+                store_chunks(doi, chunks_con_metadata_list)
+        finally:
+            # Liberar la reserva de los DOIs
+            dois_en_proceso.difference_update(dois)
+
+        return {
+            "message": "Documents uploaded successfully",
+            "DOIs": dois
+        }
+
+    except HTTPException as e:
+        raise e
+    except Exception:
+        traceback_str = traceback.format_exc()
+        return JSONResponse(
+            status_code=500,
+            content={"detail": "Error interno en el servidor.", "traceback": traceback_str},
+        )
+
 
 @router.post("/embed")
 async def generate_embeddings(doi: str):
@@ -124,7 +196,9 @@ async def generate_embeddings(doi: str):
         metadatas = [{"doi": data["doi"],
                     "title": data["title"],
                     "authors":  ", ".join(data["authors"]) if isinstance(data["authors"], list) else data["authors"],
-                    #"section_title": data["section_title"]
+                    "section_title": data["section_title"],
+                    "section_index": data["section_index"],
+                    "chunk_index": data["chunk_index"]
                     } 
                     for data in chunk_data_list if "doi" in data]
         ids = [f"{doi}_{i+1}" for i, _ in enumerate(chunks)]
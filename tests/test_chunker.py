@@ -0,0 +1,102 @@
+from utils.chunker import chunk_paper, chunk_papers, chunk_text, count_tokens, shutdown_executor, split_sentences
+
+TEXT = (
+    "Machine learning (ML) techniques applied to chemical reactions have a long history. "
+    "Reaction yields were predicted with an error below 5 % (see Fig. 3 and Ref. 12). "
+    "Smith et al. reported similar results for enzymatic catalysis in solution! "
+    "Is the model transferable to new substrates? "
+) * 20
+
+
+def test_chunks_never_exceed_max_tokens():
+    texts = [
+        TEXT,
+        "a" * 3000,
+        "CC(=O)Oc1ccccc1C(=O)O" * 200 + " end. Next sentence.",
+        "short words " * 10 + "x" * 2000 + " tail",
+    ]
+    for text in texts:
+        for max_tokens in (20, 64, 256):
+            chunks = chunk_text(text, max_tokens, 8)
+            assert chunks
+            assert all(count_tokens(chunk) <= max_tokens for chunk in chunks)
+
+
+def test_long_word_is_kept_whole_across_chunks():
+    text = "a" * 3000
+    assert "".join(chunk_text(text, 64, 8)) == text
+
+
+def test_overlap_is_made_of_whole_sentences():
+    max_tokens, overlap_tokens = 60, 20
+    chunks = chunk_text(TEXT, max_tokens, overlap_tokens)
+    assert len(chunks) > 1
+    overlaps = 0
+    for previous, current in zip(chunks, chunks[1:]):
+        previous_sentences = split_sentences(previous)
+        current_sentences = split_sentences(current)
+        # La superposición es el mayor prefijo de oraciones de current que cierra previous
+        overlap = []
+        for k in range(min(len(previous_sentences), len(current_sentences)) - 1, 0, -1):
+            if previous_sentences[-k:] == current_sentences[:k]:
+                overlap = current_sentences[:k]
+                break
+        assert count_tokens(" ".join(overlap)) <= overlap_tokens
+        overlaps += bool(overlap)
+    assert overlaps > 0
+
+
+def test_no_overlap_when_disabled():
+    chunks = chunk_text(TEXT, 60, 0)
+    assert " ".join(chunks) == " ".join(TEXT.split())
+
+
+def test_abbreviations_do_not_split_sentences():
+    text = (
+        "Dr. Who came. Prof. Smith et al. reported it in Figs. 2 and 3. "
+        "Eqs. 1 and 2 and Refs. 4 agree, cf. Table 1, e.g. Fig. 5 at ca. 300 K vs. approx. 310 K. Done."
+    )
+    assert split_sentences(text) == [
+        "Dr. Who came.",
+        "Prof. Smith et al. reported it in Figs. 2 and 3.",
+        "Eqs. 1 and 2 and Refs. 4 agree, cf. Table 1, e.g. Fig. 5 at ca. 300 K vs. approx. 310 K.",
+        "Done.",
+    ]
+
+
+def test_sentence_boundaries():
+    assert split_sentences("First one.  Second\none! Third? 4 items.") == ["First one.", "Second one!", "Third?", "4 items."]
+    assert split_sentences("   ") == []
+
+
+def test_section_title_and_content_are_normalised():
+    sections = [
+        {"section_title": {"@n": "1", "#text": "Introduction"}, "section_content": "Some text."},
+        {"section_title": ["Results", {"#text": "and discussion"}], "section_content": [{"#text": "A."}, "B."]},
+        {"section_title": {"@n": "3"}, "section_content": {"#text": "Other text."}},
+    ]
+    chunks = chunk_paper("Título", "10.1/x", ["Autor"], sections)
+    assert [chunk["section_title"] for chunk in chunks] == ["Introduction", "Results and discussion", "Sin título de sección"]
+    assert [chunk["text"] for chunk in chunks] == ["Some text.", "A. B.", "Other text."]
+    assert [(chunk["section_index"], chunk["chunk_index"]) for chunk in chunks] == [(0, 0), (1, 0), (2, 0)]
+
+
+def test_chunk_positions():
+    sections = [{"section_title": "Intro", "section_content": TEXT}, {"section_title": "Abstract", "section_content": "Short."}]
+    chunks = chunk_paper("Título", "10.1/x", ["Autor"], sections, max_tokens=60, overlap_tokens=10)
+    intro = [chunk for chunk in chunks if chunk["section_index"] == 0]
+    assert [chunk["chunk_index"] for chunk in intro] == list(range(len(intro)))
+    assert chunks[-1]["section_index"] == 1 and chunks[-1]["chunk_index"] == 0
+
+
+def test_chunk_papers_matches_sequential():
+    papers = [
+        ("Título", f"10.1/{i}", ["Autor"], [{"section_title": "Intro", "section_content": TEXT * (i + 1)}])
+        for i in range(3)
+    ]
+    expected = [chunk_paper(*paper) for paper in papers]
+    assert chunk_papers(papers, max_workers=1) == expected
+    try:
+        assert chunk_papers(papers, max_workers=2) == expected
+    finally:
+        shutdown_executor()
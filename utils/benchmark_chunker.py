@@ -0,0 +1,92 @@
+"""
+Benchmark del chunker propio (utils/chunker.py) contra el RecursiveCharacterTextSplitter de LangChain.
+
+Uso:
+    python -m utils.benchmark_chunker articulo1.xml articulo2.xml ...
+
+Sin archivos se usa un texto sintético. Para cada método se informa el tiempo,
+la cantidad de chunks, los tokens estimados por chunk, el total de tokens a embeber
+(incluye la superposición) y el porcentaje de chunks que terminan en mitad de una oración.
+"""
+import os
+import sys
+import time
+
+from utils.chunker import chunk_paper, chunk_papers, count_tokens, shutdown_executor
+from utils.utils import extract_information_XMLdict
+
+SYNTHETIC_SECTION = (
+    "Machine learning (ML) techniques applied to chemical reactions have a long history. "
+    "The present contribution discusses applications ranging from small molecule reaction dynamics "
+    "to computational platforms for reaction planning, e.g. retrosynthesis. "
+    "Reaction yields were predicted with an error below 5 % (see Fig. 3 and Ref. 12). "
+    "Smith et al. reported similar results for enzymatic catalysis in solution! "
+) * 30
+
+
+def load_papers(paths: list[str]) -> list[tuple]:
+    import xmltodict
+
+    papers = []
+    for path in paths:
+        with open(path, "rb") as f:
+            xml_content = f.read()
+        papers.append(extract_information_XMLdict(xml_content, xmltodict.parse(xml_content)))
+    return papers
+
+
+def synthetic_papers(n: int = 16) -> list[tuple]:
+    sections = [{"section_title": f"Sección {i}", "section_content": SYNTHETIC_SECTION} for i in range(8)]
+    return [("Artículo sintético", f"10.0000/synthetic.{i}", ["Autor Uno"], sections) for i in range(n)]
+
+
+def langchain_chunks(papers: list[tuple]) -> list[str]:
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+    chunks = []
+    for _, _, _, sections in papers:
+        # Misma configuración que usaba chunks_generation antes del chunker propio
+        text_splitter = RecursiveCharacterTextSplitter(chunk_size=800, chunk_overlap=30)
+        for section in sections:
+            if isinstance(section["section_content"], str):
+                chunks.extend(text_splitter.split_text(section["section_content"]))
+    return chunks
+
+
+def report(name: str, chunks: list[str], seconds: float):
+    tokens = [count_tokens(chunk) for chunk in chunks]
+    mid_sentence = sum(1 for chunk in chunks if not chunk.rstrip().endswith((".", "!", "?")))
+    print(f"{name}")
+    print(f"  tiempo: {seconds * 1000:.1f} ms")
+    print(f"  chunks: {len(chunks)}")
+    print(f"  tokens por chunk: promedio {sum(tokens) / max(len(tokens), 1):.1f}, máximo {max(tokens, default=0)}")
+    print(f"  tokens a embeber: {sum(tokens)}")
+    print(f"  chunks cortados en mitad de oración: {100 * mid_sentence / max(len(chunks), 1):.1f} %")
+
+
+def main(paths: list[str]):
+    papers = load_papers(paths) if paths else synthetic_papers()
+    print(f"Artículos: {len(papers)}\n")
+
+    start = time.perf_counter()
+    chunks = langchain_chunks(papers)
+    report("LangChain RecursiveCharacterTextSplitter (800 caracteres / 30)", chunks, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    chunks = [chunk["text"] for paper in papers for chunk in chunk_paper(*paper)]
+    report("Chunker propio, secuencial", chunks, time.perf_counter() - start)
+
+    # El pool solo se usa en la API si CHUNK_WORKERS > 1: comparar con el secuencial antes de activarlo
+    workers = int(os.getenv("CHUNK_WORKERS", os.cpu_count() or 1))
+    if workers <= 1:
+        print("Un solo worker: no se mide el pool de procesos")
+        return
+    chunk_papers(papers, max_workers=workers)  # Calienta el pool de procesos para no medir su arranque
+    start = time.perf_counter()
+    chunks = [chunk["text"] for paper_chunks in chunk_papers(papers, max_workers=workers) for chunk in paper_chunks]
+    report(f"Chunker propio, pool de {workers} procesos", chunks, time.perf_counter() - start)
+    shutdown_executor()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
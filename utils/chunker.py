@@ -0,0 +1,205 @@
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+# Configuración del chunker: el modelo de embeddings (embed-multilingual-v3.0)
+# admite hasta 512 tokens por texto, dejamos margen para no truncar.
+MAX_TOKENS = 256  # Tamaño máximo de cada fragmento (en tokens estimados)
+OVERLAP_TOKENS = 32  # Superposición máxima entre fragmentos consecutivos
+
+# Cada signo de puntuación y cada tramo de hasta 5 caracteres de una palabra cuenta como un token
+_TOKEN_PATTERN = re.compile(r"\w{1,5}|[^\w\s]")
+
+# Abreviaturas habituales en artículos científicos tras las que no se corta la oración
+_ABBREVIATIONS = [
+    "et al", "e.g", "i.e", "cf", "ca", "approx", "vs", "No",
+    "Fig", "Figs", "fig", "figs", "Eq", "Eqs", "eq", "eqs", "Ref", "Refs", "ref", "refs",
+    "Dr", "Dra", "Prof", "Profa",
+]
+
+# Fin de oración: ., ! o ? seguido de espacio y una mayúscula, número o apertura,
+# salvo que el punto cierre una de las abreviaturas anteriores.
+_SENTENCE_PATTERN = re.compile(
+    r"(?<=[.!?])"
+    + "".join(rf"(?<!\b{re.escape(abbreviation)}\.)" for abbreviation in _ABBREVIATIONS)
+    + r"\s+(?=[A-ZÁÉÍÓÚÑ0-9(\[¿¡\"“])"
+)
+
+# Pool de procesos reutilizado entre llamadas (se crea al primer uso).
+# Solo se usa si CHUNK_WORKERS es mayor que 1: por defecto los chunks se generan secuencialmente.
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def count_tokens(text: str) -> int:
+    """
+    Estima la cantidad de tokens de un texto sin llamar a la API de Cohere.
+    Las palabras largas se cuentan como varios tokens (aprox. 5 caracteres por token).
+    :param text: Texto a medir.
+    :return: Cantidad estimada de tokens.
+    """
+    return len(_TOKEN_PATTERN.findall(text))
+
+
+def to_text(value, default: str = "") -> str:
+    """
+    Normaliza un valor obtenido con xmltodict (str, dict con "#text" o lista) a texto plano.
+    """
+    if value is None:
+        return default
+    if isinstance(value, str):
+        return value.strip() or default
+    if isinstance(value, dict):
+        return to_text(value.get("#text"), default)
+    if isinstance(value, list):
+        return " ".join(filter(None, (to_text(item) for item in value))) or default
+    return str(value)
+
+
+def split_sentences(text: str) -> list[str]:
+    """
+    Divide un texto en oraciones respetando abreviaturas comunes.
+    """
+    text = " ".join(text.split())  # Normaliza espacios y saltos de línea
+    if not text:
+        return []
+    return _SENTENCE_PATTERN.split(text)
+
+
+def _split_long_word(word: str, max_tokens: int) -> list[tuple[str, int]]:
+    # Una "palabra" que supera el máximo (SMILES, InChI, URLs) se corta en tramos de caracteres
+    # en los límites de sus tokens, de modo que cada tramo tenga como mucho max_tokens
+    starts = [match.start() for match in _TOKEN_PATTERN.finditer(word)][::max_tokens]
+    ends = starts[1:] + [len(word)]
+    return [(word[start:end], count_tokens(word[start:end])) for start, end in zip(starts, ends)]
+
+
+def _split_long_sentence(sentence: str, max_tokens: int) -> list[tuple[str, int]]:
+    # Una oración que supera el máximo se corta por palabras
+    pieces = []
+    words = []
+    tokens = 0
+    for word in sentence.split(" "):
+        word_tokens = count_tokens(word)
+        parts = _split_long_word(word, max_tokens) if word_tokens > max_tokens else [(word, word_tokens)]
+        for part, part_tokens in parts:
+            if words and tokens + part_tokens > max_tokens:
+                pieces.append((" ".join(words), tokens))
+                words, tokens = [], 0
+            words.append(part)
+            tokens += part_tokens
+    if words:
+        pieces.append((" ".join(words), tokens))
+    return pieces
+
+
+def chunk_text(text: str, max_tokens: int = MAX_TOKENS, overlap_tokens: int = OVERLAP_TOKENS) -> list[str]:
+    """
+    Divide un texto en fragmentos de hasta max_tokens sin cortar oraciones.
+    Cada fragmento repite las últimas oraciones del anterior mientras no superen overlap_tokens.
+    :return: Lista de fragmentos de texto.
+    """
+    units = []
+    for sentence in split_sentences(text):
+        sentence_tokens = count_tokens(sentence)
+        if sentence_tokens > max_tokens:
+            units.extend(_split_long_sentence(sentence, max_tokens))
+        else:
+            units.append((sentence, sentence_tokens))
+
+    chunks = []
+    current = []  # Lista de (oración, tokens) del fragmento en construcción
+    current_tokens = 0
+    for unit in units:
+        if current and current_tokens + unit[1] > max_tokens:
+            chunks.append(" ".join(sentence for sentence, _ in current))
+
+            # Conserva las últimas oraciones como superposición
+            overlap = []
+            overlap_total = 0
+            for previous in reversed(current):
+                if overlap_total + previous[1] > overlap_tokens:
+                    break
+                overlap.insert(0, previous)
+                overlap_total += previous[1]
+            if overlap_total + unit[1] > max_tokens:
+                overlap, overlap_total = [], 0
+            current, current_tokens = overlap, overlap_total
+
+        current.append(unit)
+        current_tokens += unit[1]
+
+    if current:
+        chunks.append(" ".join(sentence for sentence, _ in current))
+    return chunks
+
+
+def chunk_paper(title, doi, authors, sections, max_tokens: int = MAX_TOKENS, overlap_tokens: int = OVERLAP_TOKENS) -> list[dict]:
+    """
+    Divide las secciones de un artículo en chunks y agrega la metadata de cada uno:
+    título, doi, autores, título de sección y posición (índice de sección y de chunk).
+    :return: Lista de chunks con su metadata.
+    """
+    chunks_con_metadata = []
+    for section_index, section in enumerate(sections):
+        section_title = to_text(section.get("section_title"), "Sin título de sección")
+        section_content = to_text(section.get("section_content"))
+
+        for chunk_index, chunk in enumerate(chunk_text(section_content, max_tokens, overlap_tokens)):
+            chunks_con_metadata.append({
+                "text": chunk,
+                "title": title,
+                "authors": authors,
+                "section_title": section_title,
+                "section_index": section_index,
+                "chunk_index": chunk_index,
+                "doi": doi
+            })
+
+    return chunks_con_metadata
+
+
+def _chunk_paper_args(args) -> list[dict]:
+    return chunk_paper(*args)
+
+
+def _get_executor(max_workers: int) -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # "spawn" evita copiar con fork el proceso del servidor, que ya tiene hilos y locks tomados
+            _executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+        return _executor
+
+
+def shutdown_executor():
+    """
+    Cierra el pool de procesos, si fue creado. Se llama al apagar la aplicación.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown()
+            _executor = None
+
+
+def chunk_papers(papers: list[tuple], max_tokens: int = MAX_TOKENS, overlap_tokens: int = OVERLAP_TOKENS, max_workers: int = None) -> list[list[dict]]:
+    """
+    Genera los chunks de varios artículos. Con más de un worker el trabajo se reparte
+    en un pool de procesos reutilizado entre llamadas; si no, se procesa secuencialmente.
+    :param papers: Lista de tuplas (title, doi, authors, sections).
+    :param max_workers: Cantidad de procesos del pool (por defecto, la variable de entorno CHUNK_WORKERS o 1;
+        solo se usa al crear el pool).
+    :return: Lista con los chunks de cada artículo, en el mismo orden que papers.
+    """
+    if max_workers is None:
+        max_workers = int(os.getenv("CHUNK_WORKERS", "1"))
+    args = [(title, doi, authors, sections, max_tokens, overlap_tokens) for title, doi, authors, sections in papers]
+
+    # Con un solo worker o un solo artículo no compensa enviar el trabajo a otro proceso
+    if max_workers <= 1 or len(args) <= 1:
+        return [_chunk_paper_args(paper_args) for paper_args in args]
+
+    return list(_get_executor(max_workers).map(_chunk_paper_args, args))
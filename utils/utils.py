@@ -1,5 +1,5 @@
 import re
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+from utils.chunker import chunk_paper, chunk_papers
 
 #Carga de archivos PDF
 def extract_information_XMLdict(file_content: dict, xml_dict):
@@ -90,37 +90,20 @@ def extract_information_XMLdict(file_content: dict, xml_dict):
 def chunks_generation(title, doi, authors, sections) -> list[dict]:
     """
     Toma la información extraída del XML de un artículo científico  y divide las secciones en chunks.
-    Guarda metadata del artículo: título, doi, autores, abstract y título de sección.
+    Guarda metadata del artículo: título, doi, autores, abstract, título de sección y posición del chunk.
     :return: Lista de historias con título y sus respectivos chunks.
     """
-    
-    # Configura el divisor de texto
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=800,  # Tamaño de cada fragmento
-        chunk_overlap=30  # Superposición entre fragmentos
-    )
-
-    # Lista para almacenar los fragmentos con metadatos
-    chunks_con_metadata = []
-
-    # Itera sobre las secciones para dividir el contenido y agregar los metadatos
-    for section in sections:
-        section_title = section["section_title"]
-        section_content = section["section_content"]
-        
-        # Divide el texto en fragmentos
-        chunks = text_splitter.split_text(section_content)
-        
-        # Agrega metadatos a cada fragmento
-        for chunk in chunks:
-            chunks_con_metadata.append({
-                "text": chunk,
-                "title": title,
-                "authors": authors,
-                "doi": doi
-            })
+    return chunk_paper(title, doi, authors, sections)
 
-    return chunks_con_metadata
+def chunks_generation_batch(papers: list[tuple]) -> list[list[dict]]:
+    """
+    Genera los chunks de varios artículos. Si la variable de entorno CHUNK_WORKERS es mayor que 1,
+    los artículos se reparten en un pool de procesos (reutilizado entre llamadas) de ese tamaño;
+    si no, o si el lote tiene un solo artículo, se procesan secuencialmente en el proceso actual.
+    :param papers: Lista de tuplas (title, doi, authors, sections) devueltas por extract_information_XMLdict.
+    :return: Lista con los chunks de cada artículo, en el mismo orden.
+    """
+    return chunk_papers(papers)
 
 def extract_doi_from_query(query: str) -> str:
     """